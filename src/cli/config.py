@@ -4,12 +4,24 @@ Handles both environment-based and argument-based configuration.
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from .formatters import OutputFormat
-from typing import List
+from .parser import parse_output_format
+from typing import List, Optional, Tuple
 import os
 
-@dataclass
+_ENV_KEYS = (
+    'DATAFORM_PROJECTS',
+    'DATAFORM_LOCATIONS',
+    'DATAFORM_HISTORY_DAYS',
+    'DATAFORM_SIMILARITY_THRESHOLD',
+    'DATAFORM_OUTPUT_DIR',
+    'DATAFORM_ENABLE_INCREMENTAL',
+    'DATAFORM_OUTPUT_MODE'
+)
+
+@dataclass(slots=True)
 class CLIConfig:
     """Configuration container for CLI arguments with validation."""
     projects: List[str]
@@ -23,23 +35,67 @@ class CLIConfig:
     @classmethod
     def from_env(cls) -> 'CLIConfig':
         """Create configuration from environment variables."""
+        env = os.environ
+        (
+            projects,
+            locations,
+            days_of_history,
+            similarity_threshold,
+            output_dir,
+            enable_incremental,
+            output_mode
+        ) = _parse_env(tuple((key, env.get(key)) for key in _ENV_KEYS))
+        # A fresh instance per call, so callers never share the mutable lists
         return cls(
-            projects=os.getenv('DATAFORM_PROJECTS', '').split(','),
-            locations=os.getenv('DATAFORM_LOCATIONS', 'US').split(','),
-            days_of_history=int(os.getenv('DATAFORM_HISTORY_DAYS', '30')),
-            similarity_threshold=float(os.getenv('DATAFORM_SIMILARITY_THRESHOLD', '0.9')),
-            output_dir=Path(os.getenv('DATAFORM_OUTPUT_DIR', 'output')),
-            enable_incremental=os.getenv('DATAFORM_ENABLE_INCREMENTAL', 'true').lower() == 'true',
-            output_mode=OutputFormat(os.getenv('DATAFORM_OUTPUT_MODE', 'detailed'))
+            projects=list(projects),
+            locations=list(locations),
+            days_of_history=days_of_history,
+            similarity_threshold=similarity_threshold,
+            output_dir=output_dir,
+            enable_incremental=enable_incremental,
+            output_mode=output_mode
         )
     
     def validate(self) -> None:
-        """Validate configuration parameters."""
+        """
+        Validate configuration parameters.
+        
+        All checks are run before raising, so a single ValueError reports
+        every invalid field at once.
+        """
+        errors = []
         if not self.projects or not all(self.projects):
-            raise ValueError("At least one project must be specified")
+            errors.append(f"At least one project must be specified (projects={self.projects!r})")
         if not self.locations or not all(self.locations):
-            raise ValueError("At least one location must be specified")
+            errors.append(f"At least one location must be specified (locations={self.locations!r})")
         if self.days_of_history < 1:
-            raise ValueError("Days of history must be positive")
+            errors.append(f"Days of history must be positive (days_of_history={self.days_of_history!r})")
         if not 0 <= self.similarity_threshold <= 1:
-            raise ValueError("Similarity threshold must be between 0 and 1")
\ No newline at end of file
+            errors.append(
+                f"Similarity threshold must be between 0 and 1 "
+                f"(similarity_threshold={self.similarity_threshold!r})"
+            )
+        if errors:
+            raise ValueError("\n".join(errors))
+
+@lru_cache(maxsize=4)
+def _parse_env(
+    env_items: Tuple[Tuple[str, Optional[str]], ...]
+) -> Tuple[Tuple[str, ...], Tuple[str, ...], int, float, Path, bool, OutputFormat]:
+    """
+    Parse a snapshot of the relevant environment variables into CLIConfig values.
+    
+    Keyed on the variable values so repeat calls with an unchanged
+    environment skip parsing, while changes to the environment still apply.
+    Only immutable values are cached.
+    """
+    env = {key: value for key, value in env_items if value is not None}
+    return (
+        tuple(env.get('DATAFORM_PROJECTS', '').split(',')),
+        tuple(env.get('DATAFORM_LOCATIONS', 'US').split(',')),
+        int(env.get('DATAFORM_HISTORY_DAYS', '30')),
+        float(env.get('DATAFORM_SIMILARITY_THRESHOLD', '0.9')),
+        Path(env.get('DATAFORM_OUTPUT_DIR', 'output')),
+        env.get('DATAFORM_ENABLE_INCREMENTAL', 'true').lower() == 'true',
+        parse_output_format(env.get('DATAFORM_OUTPUT_MODE', 'detailed'))
+    )
@@ -8,9 +8,15 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Dict, Any, List, Protocol
+import io
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ..models.metadata import MigrationStatus
 from ..utils.logging import get_logger
 
@@ -26,7 +32,7 @@ class OutputFormat(str, Enum):
     # HTML = "html"
     # MARKDOWN = "markdown"
 
-@dataclass
+@dataclass(slots=True)
 class MigrationResult:
     """Type-safe container for migration results."""
     project_id: str
@@ -67,28 +73,28 @@ class DetailedFormatter:
     
     def format_results(self, results: Dict[str, MigrationResult]) -> str:
         """Format detailed results with statistics and status."""
-        lines = ["Migration Results", "=" * 30]
+        buffer = io.StringIO()
+        write = buffer.write
+        write("Migration Results\n")
+        write("=" * 30)
         
         for project_id, result in results.items():
-            lines.extend([
-                f"\nProject: {project_id}",
-                f"Status: {result.status.name}",
-                f"Duration: {(result.end_time - result.start_time).total_seconds():.2f}s",
-                "\nLocation Results:",
-                *[f"- {loc}: {'✓' if success else '✗'}" 
-                  for loc, success in result.location_results.items()],
-                "\nMetrics:",
-                *[f"- {k}: {v}" for k, v in result.metrics.items()],
-            ])
+            write(f"\n\nProject: {project_id}")
+            write(f"\nStatus: {result.status.name}")
+            write(f"\nDuration: {(result.end_time - result.start_time).total_seconds():.2f}s")
+            write("\n\nLocation Results:")
+            for loc, success in result.location_results.items():
+                write(f"\n- {loc}: {'✓' if success else '✗'}")
+            write("\n\nMetrics:")
+            for k, v in result.metrics.items():
+                write(f"\n- {k}: {v}")
             
             if result.errors:
-                lines.extend([
-                    "\nErrors:",
-                    *[f"- {error['component']}: {error['error']}"
-                      for error in result.errors]
-                ])
+                write("\n\nErrors:")
+                for error in result.errors:
+                    write(f"\n- {error['component']}: {error['error']}")
         
-        return "\n".join(lines)
+        return buffer.getvalue()
     
     def write_report(self, results: Dict[str, MigrationResult], output_dir: Path) -> None:
         """Write detailed report to report.txt."""
@@ -98,9 +104,9 @@ class DetailedFormatter:
 class JSONFormatter:
     """Provides JSON-formatted output."""
     
-    def format_results(self, results: Dict[str, MigrationResult]) -> str:
-        """Format results as JSON string."""
-        formatted = {
+    def _build_dict(self, results: Dict[str, MigrationResult]) -> Dict[str, Any]:
+        """Build the JSON-serialisable representation of the results."""
+        return {
             project_id: {
                 "status": result.status.name,
                 "duration_seconds": (result.end_time - result.start_time).total_seconds(),
@@ -110,12 +116,21 @@ class JSONFormatter:
             }
             for project_id, result in results.items()
         }
-        return json.dumps(formatted, indent=2)
+    
+    def format_results(self, results: Dict[str, MigrationResult]) -> str:
+        """Format results as JSON string."""
+        if orjson is not None:
+            return orjson.dumps(self._build_dict(results), option=orjson.OPT_INDENT_2).decode()
+        return json.dumps(self._build_dict(results), indent=2)
     
     def write_report(self, results: Dict[str, MigrationResult], output_dir: Path) -> None:
-        """Write JSON results to results.json."""
+        """Write JSON results to results.json, streaming directly to the file."""
         json_file = output_dir / "results.json"
-        json_file.write_text(self.format_results(results))
+        if orjson is not None:
+            json_file.write_bytes(orjson.dumps(self._build_dict(results), option=orjson.OPT_INDENT_2))
+            return
+        with open(json_file, "w", encoding="utf-8") as f:
+            json.dump(self._build_dict(results), f, indent=2)
 
 class OutputManager:
     """Manages output formatting based on specified format."""
@@ -127,11 +142,13 @@ class OutputManager:
     }
     
     def __init__(self, format_type: OutputFormat = OutputFormat.DETAILED):
-        """Initialise with specified output format."""
-        self.formatter = self._formatters.get(format_type)
-        if not self.formatter:
-            logger.warning(f"Unsupported format {format_type}, falling back to detailed")
-            self.formatter = self._formatters[OutputFormat.DETAILED]
+        """
+        Initialise with specified output format.
+        
+        Every OutputFormat member has a registered formatter, and the CLI only
+        produces OutputFormat values, so the lookup cannot miss.
+        """
+        self.formatter = self._formatters[format_type]
     
     def format_results(self, results: Dict[str, MigrationResult]) -> str:
         """Format results using configured formatter."""
@@ -17,9 +17,10 @@ class MigrationHandler:
         """Initialise handler with configuration."""
         self.config = config
         self.orchestrator = DataformMigrationOrchestrator(config.output_dir)
-        self.output_manager = OutputManager(
-            OutputFormat(config.output_mode)
+        assert isinstance(config.output_mode, OutputFormat), (
+            f"output_mode must be an OutputFormat, got {type(config.output_mode).__name__}"
         )
+        self.output_manager = OutputManager(config.output_mode)
     
     def _collect_results(self, results: Dict[str, bool]) -> Dict[str, MigrationResult]:
         """Convert orchestrator results to detailed MigrationResults."""
@@ -30,7 +31,7 @@ class MigrationHandler:
     def run(self) -> int:
         """Execute migration and format results."""
         try:
-            results = self.orchestrator.migrate_projects(
+            results, overall_success = self.orchestrator.migrate_projects(
                 projects=self.config.projects,
                 locations=self.config.locations,
                 days_of_history=self.config.days_of_history,
@@ -47,7 +48,7 @@ class MigrationHandler:
             # print(formatted_output)
             # self.output_manager.write_report(detailed_results, self.config.output_dir)
             
-            return 0 if all(results.values()) else 1
+            return 0 if overall_success else 1
             
         except Exception as e:
             logger.error(f"Migration failed: {str(e)}")
@@ -7,7 +7,6 @@ import sys
 from typing import Optional, Sequence
 from .config import CLIConfig
 from .parser import create_parser, parse_comma_separated
-from .handlers import MigrationHandler
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -37,7 +36,10 @@ def run_cli(args: Optional[Sequence[str]] = None) -> int:
         )
         
         config.validate()
-        handler = MigrationHandler(config)        
+
+        # Deferred so --help and invalid arguments don't pay for importing the migration stack
+        from .handlers import MigrationHandler
+        handler = MigrationHandler(config)
         status = handler.run()
 
         # TODO give more detailed output on success/failure
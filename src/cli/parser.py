@@ -7,12 +7,19 @@ import argparse
 from pathlib import Path
 from typing import List
 
-from .config import OutputFormat
+from .formatters import OutputFormat
 
 def parse_comma_separated(value: str) -> List[str]:
     """Parse comma-separated string into list of strings."""
     return [item.strip() for item in value.split(',') if item.strip()]
 
+def parse_output_format(value: str) -> OutputFormat:
+    """Parse an output format from its name or value, ignoring case."""
+    try:
+        return OutputFormat[value.upper()]
+    except KeyError:
+        return OutputFormat(value.lower())
+
 def create_parser() -> argparse.ArgumentParser:
     """Create and configure argument parser."""
     parser = argparse.ArgumentParser(
@@ -64,7 +71,7 @@ def create_parser() -> argparse.ArgumentParser:
     
     parser.add_argument(
         "--output-mode",
-        type=lambda x: OutputFormat[x.upper()],
+        type=parse_output_format,
         choices=list(OutputFormat),
         default=OutputFormat.DETAILED,
         help="Output verbosity level"
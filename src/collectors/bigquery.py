@@ -4,9 +4,12 @@ Handles the collection and processing of metadata from BigQuery environments.
 Includes collection of table and job metadata. To be used in conjunction with the CLI module.
 """
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any
-from google.cloud import bigquery
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Any, Optional, Tuple, Union
+import re
+import threading
+import time
 from ..models.metadata import (
     TableMetadata, 
     SchemaMetadata, 
@@ -18,8 +21,89 @@ from ..models.metadata import (
 from ..models.config import ProjectConfig
 from ..utils.logging import get_logger
 
+if TYPE_CHECKING:
+    from google.cloud import bigquery
+
 logger = get_logger(__name__)
 
+# One query per dataset covering every (possibly nested) column of every table.
+# Rows are ordered so that parent fields always precede their nested fields.
+_DATASET_SCHEMA_QUERY = """
+SELECT
+    paths.table_name,
+    paths.field_path,
+    paths.data_type,
+    paths.description,
+    paths.policy_tags,
+    columns.is_nullable,
+    tables.last_modified_time
+FROM `{project}.{dataset}.INFORMATION_SCHEMA.COLUMN_FIELD_PATHS` AS paths
+JOIN `{project}.{dataset}.INFORMATION_SCHEMA.COLUMNS` AS columns
+    ON columns.table_name = paths.table_name
+    AND columns.column_name = paths.column_name
+LEFT JOIN `{project}.{dataset}.__TABLES__` AS tables
+    ON tables.table_id = paths.table_name
+ORDER BY paths.table_name, columns.ordinal_position, paths.field_path
+"""
+
+# Label marking the schema queries this tool runs, so its own jobs are left out of the job history
+_SCHEMA_QUERY_LABEL = ('dataform-bootstrap', 'schema-query')
+
+# INFORMATION_SCHEMA reports GoogleSQL type names; the tables API uses the legacy names
+_LEGACY_TYPE_NAMES = {
+    'INT64': 'INTEGER',
+    'FLOAT64': 'FLOAT',
+    'BOOL': 'BOOLEAN',
+    'STRUCT': 'RECORD'
+}
+
+def _parse_data_type(data_type: str) -> Tuple[str, bool]:
+    """
+    Convert an INFORMATION_SCHEMA data type into a tables API field type.
+    
+    Args:
+        data_type: Type as reported by INFORMATION_SCHEMA, e.g. ``ARRAY<STRUCT<a INT64>>``
+        
+    Returns:
+        Tuple of the field type and whether the field is repeated
+    """
+    repeated = data_type.startswith('ARRAY<')
+    if repeated:
+        data_type = data_type[len('ARRAY<'):-1]
+    base_type = re.split(r'[<(]', data_type, maxsplit=1)[0].strip()
+    return _LEGACY_TYPE_NAMES.get(base_type, base_type), repeated
+
+class RateLimiter:
+    """
+    Token bucket limiting the rate of BigQuery API requests across threads.
+    
+    A single limiter can be shared by several collectors, so that every
+    location of a project draws on the same per-project quota.
+    
+    Attributes:
+        rate (float): Tokens added per second, also the bucket capacity
+    """
+    
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request token is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
 class BigQueryMetadataCollector:
     """
     Collects and processes metadata from BigQuery environments.
@@ -27,21 +111,34 @@ class BigQueryMetadataCollector:
     Attributes:
         config (ProjectConfig): Configuration settings for the collection process
         client (bigquery.Client): Authenticated BigQuery client
+        rate_limiter (RateLimiter): Limiter throttling ``get_table`` requests
     """
     
-    def __init__(self, config: ProjectConfig, location: LocationConfig):
+    def __init__(
+        self,
+        config: ProjectConfig,
+        location: LocationConfig,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        # Imported here as google-cloud-bigquery is slow to import and is not needed for CLI parsing
+        from google.cloud import bigquery
+
         self.config = config
         self.location = location
-        self.client = bigquery.Client(project=config.project_id, location=location)
+        self.rate_limiter = rate_limiter or RateLimiter(config.max_requests_per_second)
+        self.client = bigquery.Client(project=config.project_id, location=location.location)
 
-    def collect_job_metadata(self) -> List[JobMetadata]:
+    def iter_job_metadata(self) -> Iterator[JobMetadata]:
         """
-        Collect metadata for all relevant jobs in the project.
+        Stream metadata for all relevant jobs in the project.
         
-        Returns:
-            List[JobMetadata]: Collection of processed job metadata
+        Jobs are yielded as they are read from the paginated BigQuery listing,
+        so callers that consume them in a single pass never hold the full job
+        history in memory.
+        
+        Yields:
+            JobMetadata: Processed metadata for each query job
         """
-        jobs_metadata = []
         start_time = datetime.now(timezone.utc) - timedelta(days=self.config.days_of_history)
         
         try:
@@ -51,8 +148,11 @@ class BigQueryMetadataCollector:
                 all_users=True
             )
             
+            label_key, label_value = _SCHEMA_QUERY_LABEL
             for job in jobs:
                 if job.job_type == 'query':
+                    if job.labels and job.labels.get(label_key) == label_value:
+                        continue
                     try:
                         job_metadata = JobMetadata(
                             job_id=job.job_id,
@@ -66,60 +166,87 @@ class BigQueryMetadataCollector:
                             ),
                             query=job.query,
                             referenced_tables=[
-                                table.to_api_repr() 
+                                (table.project, table.dataset_id, table.table_id)
                                 for table in job.referenced_tables
                             ],
                             labels=job.labels
                         )
-                        jobs_metadata.append(job_metadata)
                     except Exception as e:
                         logger.error(f"Error processing job {job.job_id}: {str(e)}")
                         continue
+                    yield job_metadata
                         
         except Exception as e:
             logger.error(f"Error collecting jobs: {str(e)}")
+
+    def collect_job_metadata(self) -> List[JobMetadata]:
+        """
+        Collect metadata for all relevant jobs in the project.
         
-        return jobs_metadata
+        Returns:
+            List[JobMetadata]: Collection of processed job metadata
+        """
+        return list(self.iter_job_metadata())
 
     def collect_table_metadata(self) -> List[TableMetadata]:
         """
         Collect metadata for all tables in the project.
         
+        Each dataset's table schemas are read with a single INFORMATION_SCHEMA
+        query and combined with the table listing, so most tables need no
+        per-table request. Tables missing from the query results fall back to
+        ``get_table`` calls, which are issued concurrently on a thread pool and
+        throttled to stay within the BigQuery ``tables.get`` quota.
+        
         Returns:
             List[TableMetadata]: Collection of processed table metadata
         """
         tables_metadata = []
         
+        def fetch_table(table_reference):
+            self.rate_limiter.acquire()
+            return self.client.get_table(table_reference)
+        
         try:
-            datasets = list(self.client.list_datasets())
-            
-            for dataset in datasets:
-                logger.debug(f"Processing dataset: {dataset.dataset_id}")
-                tables = list(self.client.list_tables(dataset.reference))
+            with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+                # Submitted while the dataset listing pages in, so work starts on the first page
+                dataset_futures = [
+                    (dataset, executor.submit(self._collect_dataset_tables, dataset.dataset_id, dataset.reference))
+                    for dataset in self.client.list_datasets()
+                ]
                 
-                for table in tables:
+                # Results are gathered in listing order so the output is the same on every run
+                pending = []
+                for dataset, dataset_future in dataset_futures:
                     try:
-                        table_ref = self.client.get_table(table.reference)
-                        schema = self._process_table_schema(table_ref)
+                        tables, schemas = dataset_future.result()
+                    except Exception as e:
+                        logger.error(f"Error processing dataset {dataset.dataset_id}: {str(e)}")
+                        continue
+                    
+                    for table in tables:
+                        if table.table_id not in schemas:
+                            pending.append((dataset, table, executor.submit(fetch_table, table.reference)))
+                            continue
                         
-                        metadata = TableMetadata(
-                            project_id=self.config.project_id,
-                            dataset_id=dataset.dataset_id,
-                            table_id=table.table_id,
-                            table_type=table_ref.table_type,
-                            schema=schema,
-                            created_time=table_ref.created,
-                            last_modified_time=table_ref.modified,
-                            partitioning=(
-                                table_ref.time_partitioning.to_api_repr() 
-                                if table_ref.time_partitioning 
-                                else None
-                            ),
-                            clustering=table_ref.clustering_fields,
-                            labels=table_ref.labels
-                        )
-                        # TODO Add more metadata fields here and optimise the output format
-                        tables_metadata.append(metadata)
+                        schema, last_modified_time = schemas[table.table_id]
+                        pending.append((
+                            dataset,
+                            table,
+                            self._build_table_metadata(dataset.dataset_id, table, schema, last_modified_time)
+                        ))
+                
+                for dataset, table, result in pending:
+                    try:
+                        if isinstance(result, Future):
+                            table_ref = result.result()
+                            result = self._build_table_metadata(
+                                dataset.dataset_id,
+                                table_ref,
+                                self._process_table_schema(table_ref),
+                                table_ref.modified
+                            )
+                        tables_metadata.append(result)
                         logger.debug(f"Successfully processed table: {table.table_id}")
                         
                     except Exception as e:
@@ -131,7 +258,155 @@ class BigQueryMetadataCollector:
         
         return tables_metadata
 
-    def _process_table_schema(self, table_ref: bigquery.Table) -> SchemaMetadata:
+    def _collect_dataset_tables(
+        self,
+        dataset_id: str,
+        dataset_reference: 'bigquery.DatasetReference'
+    ) -> Tuple[List['bigquery.table.TableListItem'], Dict[str, Tuple[SchemaMetadata, Optional[datetime]]]]:
+        """
+        List the tables in a dataset along with their schemas.
+        
+        Args:
+            dataset_id: Dataset to process
+            dataset_reference: BigQuery reference for the dataset
+            
+        Returns:
+            Tuple of the listed tables and a mapping of table ID to its schema and
+            last modified time. Tables absent from the mapping must be fetched
+            individually.
+        """
+        logger.debug(f"Processing dataset: {dataset_id}")
+        table_iterator = iter(self.client.list_tables(dataset_reference))
+        first_table = next(table_iterator, None)
+        if first_table is None:
+            return [], {}
+        
+        # Start the schema query before paging through the remaining tables so the two overlap
+        schemas = {}
+        try:
+            from google.cloud import bigquery
+            
+            label_key, label_value = _SCHEMA_QUERY_LABEL
+            schema_job = self.client.query(
+                _DATASET_SCHEMA_QUERY.format(project=self.config.project_id, dataset=dataset_id),
+                job_config=bigquery.QueryJobConfig(labels={label_key: label_value}),
+                location=self.location.location
+            )
+        except Exception as e:
+            logger.warning(self._schema_fallback_message(dataset_id, e))
+            schema_job = None
+        
+        tables = [first_table, *table_iterator]
+        
+        if schema_job is not None:
+            try:
+                schemas = self._parse_dataset_schemas(schema_job.result())
+            except Exception as e:
+                logger.warning(self._schema_fallback_message(dataset_id, e))
+        
+        return tables, schemas
+
+    def _schema_fallback_message(self, dataset_id: str, error: Exception) -> str:
+        """Describe a failed INFORMATION_SCHEMA lookup for a dataset."""
+        return (
+            f"INFORMATION_SCHEMA lookup failed for dataset {dataset_id}, "
+            f"falling back to per-table requests: {str(error)}"
+        )
+
+    def _parse_dataset_schemas(
+        self,
+        rows: Iterable[Any]
+    ) -> Dict[str, Tuple[SchemaMetadata, Optional[datetime]]]:
+        """
+        Build table schemas from the rows of a dataset schema query.
+        
+        Args:
+            rows: Result rows of ``_DATASET_SCHEMA_QUERY``
+            
+        Returns:
+            Dict mapping table ID to its schema and last modified time
+        """
+        columns_by_table: Dict[str, List[ColumnMetadata]] = {}
+        fields_by_path: Dict[Tuple[str, str], ColumnMetadata] = {}
+        last_modified: Dict[str, Optional[datetime]] = {}
+        
+        for row in rows:
+            field_type, repeated = _parse_data_type(row.data_type)
+            parent_path, _, name = row.field_path.rpartition('.')
+            
+            if repeated:
+                mode = 'REPEATED'
+            elif not parent_path and row.is_nullable == 'NO':
+                mode = 'REQUIRED'
+            else:
+                mode = 'NULLABLE'
+            
+            column = ColumnMetadata(
+                name=name,
+                field_type=field_type,
+                description=row.description,
+                mode=mode,
+                policy_tags=list(row.policy_tags or [])
+            )
+            fields_by_path[(row.table_name, row.field_path)] = column
+            
+            if parent_path:
+                parent = fields_by_path.get((row.table_name, parent_path))
+                if parent is not None:
+                    parent.fields.append(column)
+            else:
+                columns_by_table.setdefault(row.table_name, []).append(column)
+            
+            if row.table_name not in last_modified:
+                last_modified[row.table_name] = (
+                    datetime.fromtimestamp(row.last_modified_time / 1000, tz=timezone.utc)
+                    if row.last_modified_time is not None
+                    else None
+                )
+        
+        return {
+            table_id: (SchemaMetadata(columns=columns), last_modified[table_id])
+            for table_id, columns in columns_by_table.items()
+        }
+
+    def _build_table_metadata(
+        self,
+        dataset_id: str,
+        table: Union['bigquery.Table', 'bigquery.table.TableListItem'],
+        schema: SchemaMetadata,
+        last_modified_time: Optional[datetime]
+    ) -> TableMetadata:
+        """
+        Build TableMetadata from a listed or fully fetched BigQuery table.
+        
+        Args:
+            dataset_id: Dataset containing the table
+            table: BigQuery table from ``list_tables`` or ``get_table``
+            schema: Processed schema for the table
+            last_modified_time: Last modification timestamp, if known
+            
+        Returns:
+            TableMetadata: Processed table information
+        """
+        # TODO Add more metadata fields here and optimise the output format
+        return TableMetadata(
+            project_id=self.config.project_id,
+            dataset_id=dataset_id,
+            table_id=table.table_id,
+            table_type=table.table_type,
+            schema=schema,
+            created_time=table.created,
+            last_modified_time=last_modified_time,
+            partitioning=(
+                table.time_partitioning.to_api_repr() 
+                if table.time_partitioning 
+                else None
+            ),
+            clustering=table.clustering_fields,
+            labels=table.labels
+        )
+
+    def _process_table_schema(self, table_ref: 'bigquery.Table') -> SchemaMetadata:
         """
         Process BigQuery table schema into SchemaMetadata.
         
@@ -3,22 +3,48 @@ Dataform action configuration generator module.
 Handles the generation of Dataform actions.yaml configurations from BigQuery metadata.
 """
 
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional, Set
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Set, Tuple, Union
+import operator
+import os
 import yaml
 from pathlib import Path
 
+try:
+    from yaml import CSafeDumper as _BaseDumper
+except ImportError:
+    from yaml import SafeDumper as _BaseDumper
+
 from ..models.metadata import TableMetadata, JobMetadata, ColumnMetadata
 from ..models.config import ProjectConfig, OutputConfig
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
-@dataclass
+def _str_representer(dumper: _BaseDumper, data: str) -> yaml.ScalarNode:
+    """Represent multi-line strings using YAML block style."""
+    return dumper.represent_scalar(
+        'tag:yaml.org,2002:str',
+        data,
+        style='|' if '\n' in data else None
+    )
+
+class _ActionsDumper(_BaseDumper):
+    """YAML dumper for actions.yaml, scoped so its representers stay local."""
+
+_ActionsDumper.add_representer(str, _str_representer)
+
+_COLUMN_SORT_KEY = operator.attrgetter('path')
+
+@dataclass(slots=True, frozen=True)
 class DependencyTarget:
     """
     Represents a Dataform dependency target with full reference information.
     
+    Frozen so the generated __eq__ and __hash__ can be used for deduplication in sets.
+    
     Attributes:
         project: Google Cloud project ID
         dataset: Dataset/schema name
@@ -35,43 +61,56 @@ class DependencyTarget:
             'dataset': self.dataset,
             'name': self.name
         }
-    
-    def __hash__(self) -> int:
-        """Enable using DependencyTarget in sets for deduplication."""
-        return hash((self.project, self.dataset, self.name))
-    
-    def __eq__(self, other) -> bool:
-        """Enable comparison of DependencyTarget objects."""
-        if not isinstance(other, DependencyTarget):
-            return False
-        return (self.project == other.project and 
-                self.dataset == other.dataset and 
-                self.name == other.name)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ColumnConfig:
-    """Represents a Dataform column configuration with path-based structure."""
-    path: List[str]
+    """
+    Represents a Dataform column configuration with path-based structure.
+    
+    Frozen so identical columns can share a single interned instance. The path
+    and tags are stored as tuples, with tags sorted, and to_dict returns fresh
+    lists so shared instances never hand out shared mutable state.
+    """
+    path: Tuple[str, ...]
     description: Optional[str] = None
-    tags: List[str] = field(default_factory=list)
-    bigquery_policy_tags: List[str] = field(default_factory=list)
+    tags: Tuple[str, ...] = ()
+    bigquery_policy_tags: Tuple[str, ...] = ()
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert column configuration to dictionary format."""
-        config = {'path': self.path}
+        # Most columns carry no metadata, so skip the per-field checks for them
+        if not (self.description or self.tags or self.bigquery_policy_tags):
+            return {'path': list(self.path)}
+        
+        config = {'path': list(self.path)}
         
         if self.description:
             config['description'] = self.description
         
         if self.tags:
-            config['tags'] = sorted(self.tags)
+            config['tags'] = list(self.tags)
             
         if self.bigquery_policy_tags:
-            config['bigqueryPolicyTags'] = sorted(self.bigquery_policy_tags)
+            config['bigqueryPolicyTags'] = list(self.bigquery_policy_tags)
             
         return config
 
-@dataclass
+@lru_cache(maxsize=65536)
+def _make_column_config(
+    path: Tuple[str, ...],
+    description: Optional[str],
+    tags: Tuple[str, ...],
+    bigquery_policy_tags: Tuple[str, ...]
+) -> ColumnConfig:
+    """Create a ColumnConfig, reusing the existing instance for identical columns."""
+    return ColumnConfig(
+        path=path,
+        description=description,
+        tags=tags,
+        bigquery_policy_tags=bigquery_policy_tags
+    )
+
+@dataclass(slots=True)
 class ActionDefinition:
     """
     Represents a single Dataform action definition.
@@ -83,8 +122,9 @@ class ActionDefinition:
         project: Project ID (required for declarations)
         filename: Optional file path (not used for declarations)
         description: Optional description
-        columns: List of column configurations
-        dependency_targets: List of dependent actions with full references
+        columns: List of column configurations, sorted by path
+        dependency_targets: List of dependent actions with full references, sorted by
+            (project, dataset, name)
         config: Additional configuration options
         disabled: Whether the action is disabled
     """
@@ -101,39 +141,30 @@ class ActionDefinition:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert action definition to dictionary format."""
-        action_dict = {
-            self.type: {
-                'name': self.name,
-                'dataset': self.schema,
-                'project': self.project
-            }
+        action = {
+            'name': self.name,
+            'dataset': self.schema,
+            'project': self.project
         }
         
         if self.type != 'declaration':
             if not self.filename:
                 raise ValueError(f"Filename is required for non-declaration action {self.name}")
-            action_dict[self.type]['filename'] = self.filename
+            action['filename'] = self.filename
         
         if self.description:
-            action_dict[self.type]['description'] = self.description
+            action['description'] = self.description
             
         if self.columns:
-            action_dict[self.type]['columns'] = [
-                col.to_dict() for col in sorted(self.columns, key=lambda x: x.path)
-            ]
+            action['columns'] = [col.to_dict() for col in self.columns]
             
         if self.dependency_targets:
-            action_dict[self.type]['dependencyTargets'] = [
-                dep.to_dict() for dep in sorted(
-                    self.dependency_targets,
-                    key=lambda x: (x.project, x.dataset, x.name)
-                )
-            ]
+            action['dependencyTargets'] = [dep.to_dict() for dep in self.dependency_targets]
             
         if self.config:
-            action_dict[self.type].update(self.config)
+            action.update(self.config)
             
-        return action_dict
+        return {self.type: action}
 
 class DataformActionsGenerator:
     """Generates Dataform action configurations from BigQuery metadata."""
@@ -141,11 +172,13 @@ class DataformActionsGenerator:
     def __init__(self, project_config: ProjectConfig, output_config: OutputConfig):
         self.project_config = project_config
         self.output_config = output_config
+        self._definitions_root = Path(self.output_config.definitions_dir)
+        self._created_dirs: Set[str] = set()
         self._ensure_output_directory()
     
     def _ensure_output_directory(self) -> None:
         """Ensure the output directory structure exists."""
-        Path(self.output_config.definitions_dir).mkdir(parents=True, exist_ok=True)
+        self._definitions_root.mkdir(parents=True, exist_ok=True)
     
     def _ensure_sql_file(self, dataset: str, table_id: str) -> None:
         """
@@ -157,13 +190,18 @@ class DataformActionsGenerator:
             
         Creates an empty SQL file if it doesn't exist.
         """
-        dataset_dir = Path(self.output_config.definitions_dir) / dataset
-        dataset_dir.mkdir(exist_ok=True)
+        dataset_dir = self._definitions_root / dataset
+        if dataset not in self._created_dirs:
+            dataset_dir.mkdir(exist_ok=True)
+            self._created_dirs.add(dataset)
         
         sql_file = dataset_dir / f"{table_id}.sql"
-        if not sql_file.exists():
-            sql_file.touch()
-            logger.info(f"Created empty SQL file: {sql_file}")
+        # O_EXCL makes the existence check and creation a single syscall
+        try:
+            os.close(os.open(sql_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        except FileExistsError:
+            return
+        logger.info(f"Created empty SQL file: {sql_file}")
 
     def _parse_column_path(self, column_name: str) -> List[str]:
         """Parse a column name into path segments."""
@@ -171,11 +209,11 @@ class DataformActionsGenerator:
 
     def _convert_column_metadata(self, column: ColumnMetadata) -> ColumnConfig:
         """Convert ColumnMetadata to Dataform column configuration."""
-        return ColumnConfig(
-            path=self._parse_column_path(column.name),
-            description=column.description,
-            tags=column.tags,
-            bigquery_policy_tags=column.policy_tags
+        return _make_column_config(
+            tuple(self._parse_column_path(column.name)),
+            column.description,
+            tuple(sorted(column.tags)),
+            tuple(sorted(column.policy_tags))
         )
 
     def _generate_config_from_table(
@@ -203,23 +241,20 @@ class DataformActionsGenerator:
     def _collect_dependencies(
         self,
         table: TableMetadata,
-        jobs: List[JobMetadata]
-    ) -> Set[DependencyTarget]:
-        """Collect and deduplicate dependencies from jobs."""
-        dependencies = set()
-        table_ref = f"{table.project_id}.{table.dataset_id}.{table.table_id}"
+        jobs: Iterable[JobMetadata]
+    ) -> List[DependencyTarget]:
+        """Collect, deduplicate and sort dependencies from jobs."""
+        table_key = (table.project_id, table.dataset_id, table.table_id)
+        dependency_keys = set()
         
         for job in jobs:
-            for ref in job.referenced_tables:
-                ref_str = f"{ref['projectId']}.{ref['datasetId']}.{ref['tableId']}"
-                if ref_str != table_ref:
-                    dependencies.add(DependencyTarget(
-                        project=ref['projectId'],
-                        dataset=ref['datasetId'],
-                        name=ref['tableId']
-                    ))
+            dependency_keys.update(job.referenced_tables)
+        dependency_keys.discard(table_key)
         
-        return dependencies
+        return [
+            DependencyTarget(project=project, dataset=dataset, name=name)
+            for project, dataset, name in sorted(dependency_keys)
+        ]
 
     def _create_declaration(self, dependency: DependencyTarget) -> ActionDefinition:
         """Create a declaration action for an external dependency."""
@@ -233,16 +268,16 @@ class DataformActionsGenerator:
     def generate_action(
         self,
         table: TableMetadata,
-        jobs: List[JobMetadata]
+        jobs: Iterable[JobMetadata]
     ) -> ActionDefinition:
         """Generate a single Dataform action definition."""
         # Ensure SQL file exists
         self._ensure_sql_file(table.dataset_id, table.table_id)
         
-        columns = [
-            self._convert_column_metadata(col)
-            for col in table.schema.columns
-        ]
+        columns = sorted(
+            (self._convert_column_metadata(col) for col in table.schema.columns),
+            key=_COLUMN_SORT_KEY
+        )
         
         dependencies = self._collect_dependencies(table, jobs)
         config = self._generate_config_from_table(table)
@@ -256,27 +291,31 @@ class DataformActionsGenerator:
             description=f"Auto-generated from {table.project_id}.{table.dataset_id}.{table.table_id}",
             disabled=False,
             columns=columns,
-            dependency_targets=list(dependencies),
+            dependency_targets=dependencies,
             config=config
         )
 
-    def generate_actions_yaml(
+    def iter_actions(
         self,
         tables: List[TableMetadata],
-        jobs: List[JobMetadata]
-    ) -> Dict[str, Any]:
-        """Generate complete actions.yaml configuration."""
-        actions_config = {'actions': []}
+        jobs: Iterable[JobMetadata]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Generate action dictionaries for actions.yaml in output order.
         
+        Jobs are consumed in a single pass, so a generator such as
+        BigQueryMetadataCollector.iter_job_metadata can be passed directly.
+        Each action is only converted to a dictionary as it is yielded.
+        """
         # Track all known tables and dependencies - This is to ensure that required dependencies are declared if they are not present in the tables list
-        known_tables = {
-            (table.project_id, table.dataset_id, table.table_id)
+        known_tables = frozenset(
+            DependencyTarget(project=table.project_id, dataset=table.dataset_id, name=table.table_id)
             for table in tables
-        }
+        )
         all_dependencies = set()
         
         # Generate primary actions and collect dependencies
-        jobs_by_table = {}
+        jobs_by_table = defaultdict(list)
         for job in jobs:
             if job.destination_table:
                 key = (
@@ -284,60 +323,83 @@ class DataformActionsGenerator:
                     job.destination_table['datasetId'],
                     job.destination_table['tableId']
                 )
-                if key not in jobs_by_table:
-                    jobs_by_table[key] = []
                 jobs_by_table[key].append(job)
         
         # First pass: create main actions and collect dependencies
         actions = []
         for table in tables:
             table_key = (table.project_id, table.dataset_id, table.table_id)
-            table_jobs = jobs_by_table.get(table_key, [])
+            table_jobs = jobs_by_table.get(table_key, ())
             
             action = self.generate_action(table, table_jobs)
             actions.append(action)
             all_dependencies.update(action.dependency_targets)
         
         # Second pass: add declarations for external dependencies
-        for dep in all_dependencies:
-            dep_key = (dep.project, dep.dataset, dep.name)
-            if dep_key not in known_tables:
-                declaration = self._create_declaration(dep)
-                actions.append(declaration)
+        actions.extend(
+            self._create_declaration(dep)
+            for dep in all_dependencies - known_tables
+        )
         
         # Sort actions to ensure consistent output
         actions.sort(key=lambda x: (x.type != 'declaration', x.project, x.schema, x.name))
-        actions_config['actions'] = [action.to_dict() for action in actions]
-        
-        return actions_config
+        for action in actions:
+            yield action.to_dict()
+
+    def generate_actions_yaml(
+        self,
+        tables: List[TableMetadata],
+        jobs: Iterable[JobMetadata]
+    ) -> Dict[str, Any]:
+        """Generate complete actions.yaml configuration."""
+        return {'actions': list(self.iter_actions(tables, jobs))}
 
-    def write_actions_yaml(self, actions_config: Dict[str, Any]) -> None:
-        """Write actions configuration to YAML file."""
+    def write_actions_yaml(
+        self,
+        actions: Union[Dict[str, Any], Iterable[Dict[str, Any]]]
+    ) -> None:
+        """
+        Write actions configuration to YAML file.
+        
+        Accepts either a complete configuration from generate_actions_yaml or an
+        iterable of action dictionaries such as iter_actions. Actions are
+        serialised one at a time, so an iterable is never held in memory whole.
+        
+        The YAML is written to a temporary file that replaces actions.yaml only
+        once every action has been written, so an error while generating or
+        writing actions leaves any existing file untouched.
+        """
         actions_file = Path(self.output_config.definitions_dir) / 'actions.yaml'
+        temp_file = actions_file.with_name(f'.{actions_file.name}.tmp')
+        if isinstance(actions, dict):
+            actions = actions['actions']
         
         try:
-            yaml.add_representer(
-                str,
-                lambda dumper, data: dumper.represent_scalar(
-                    'tag:yaml.org,2002:str',
-                    data,
-                    style='|' if '\n' in data else None
-                )
-            )
-            
-            with open(actions_file, 'w') as f:
-                yaml.dump(
-                    actions_config,
-                    f,
-                    sort_keys=False,
-                    default_flow_style=False,
-                    allow_unicode=True,
-                    width=120,
-                    indent=2
-                )
+            with open(temp_file, 'w') as f:
+                has_actions = False
+                for action in actions:
+                    if not has_actions:
+                        f.write('actions:\n')
+                        has_actions = True
+                    # Top-level sequences are indentless, so each item matches its nested form
+                    yaml.dump(
+                        [action],
+                        f,
+                        Dumper=_ActionsDumper,
+                        sort_keys=False,
+                        default_flow_style=False,
+                        allow_unicode=True,
+                        width=120,
+                        indent=2
+                    )
+                
+                if not has_actions:
+                    f.write('actions: []\n')
             
+            os.replace(temp_file, actions_file)
             logger.info(f"Successfully wrote actions.yaml to {actions_file}")
             
         except Exception as e:
-            logger.error(f"Error writing actions.yaml: {str(e)}")
-            raise
\ No newline at end of file
+            temp_file.unlink(missing_ok=True)
+            logger.error(f"Error generating or writing actions.yaml, existing file kept: {str(e)}")
+            raise
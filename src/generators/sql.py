@@ -4,12 +4,27 @@ Handles deduplication and file writing based on similarity.
 Supports logging of deduplication decisions.
 """
 
-from typing import List, Dict
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, List, Dict, Set
 import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from ..models.metadata import JobMetadata
 from ..models.config import OutputConfig
-from ..utils.similarity import calculate_similarity
+from ..utils.similarity import (
+    LSH_MIN_QUERIES,
+    LSH_MIN_THRESHOLD,
+    NormalisedQuery,
+    QueryLSHIndex,
+    find_similar_queries,
+    find_similar_queries_lsh
+)
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -20,37 +35,73 @@ class SQLGenerator:
     def __init__(self, output_config: OutputConfig, similarity_threshold: float = 0.9):
         self.output_config = output_config
         self.similarity_threshold = similarity_threshold
+        self._pending_logs: Dict[Path, List[Dict[str, Any]]] = defaultdict(list)
+        # Output paths are joined as strings to avoid building a Path per file
+        self._defs_root_str = os.fspath(output_config.definitions_dir)
+        self._created_dirs: Set[str] = set()
     
     def deduplicate_queries(self, jobs: List[JobMetadata]) -> List[Dict]:
-        """Deduplicate similar queries and track decisions."""
+        """
+        Deduplicate similar queries and track decisions.
+        
+        For large job lists at high thresholds, accepted queries are held in an
+        LSH index, so each job is only compared against the accepted queries
+        likely to be similar rather than all of them. Smaller lists and lower
+        thresholds, where the index would miss matches, compare exhaustively.
+        Jobs repeating the exact text of an earlier job (reruns, scheduled
+        queries) reuse that job's outcome without any comparison, and pairs
+        whose lengths alone rule out a match are skipped. Each query is
+        normalised once and reused for every comparison.
+        """
         unique_queries = []
+        unique_normalised: List[NormalisedQuery] = []
+        index = None
+        if self.similarity_threshold >= LSH_MIN_THRESHOLD and len(jobs) > LSH_MIN_QUERIES:
+            index = QueryLSHIndex()
+        seen_queries: Dict[str, List[Dict]] = {}
         
         for job in jobs:
             if not job.query:
                 continue
-                
-            is_unique = True
-            similar_queries = []
             
-            for existing in unique_queries:
-                similarity = calculate_similarity(job.query, existing['query'])
-                if similarity >= self.similarity_threshold:
-                    is_unique = False
-                    similar_queries.append({
-                        'job_id': existing['job_id'],
+            similar_queries = seen_queries.get(job.query)
+            if similar_queries is None:
+                query = NormalisedQuery.from_query(job.query)
+                
+                # Candidates are scored in one batch, and logged in acceptance order
+                if index is not None:
+                    matches = find_similar_queries_lsh(
+                        query,
+                        unique_normalised,
+                        index,
+                        self.similarity_threshold
+                    )
+                else:
+                    matches = find_similar_queries(query, unique_normalised, self.similarity_threshold)
+                similar_queries = [
+                    {
+                        'job_id': unique_queries[idx]['job_id'],
                         'similarity': similarity
+                    }
+                    for idx, similarity in sorted(matches)
+                ]
+                
+                if not similar_queries:
+                    if index is not None:
+                        index.add(len(unique_queries), query)
+                    unique_normalised.append(query)
+                    unique_queries.append({
+                        'query': job.query,
+                        'job_id': job.job_id,
+                        'created_time': job.created_time
                     })
-            
-            if is_unique:
-                unique_queries.append({
-                    'query': job.query,
-                    'job_id': job.job_id,
-                    'created_time': job.created_time
-                })
+                    seen_queries[job.query] = [{'job_id': job.job_id, 'similarity': 1.0}]
+                    continue
+                
+                seen_queries[job.query] = similar_queries
             
             # Log the decision
-            if similar_queries:
-                self._log_deduplication_decision(job, similar_queries)
+            self._log_deduplication_decision(job, similar_queries)
         
         return unique_queries
     
@@ -68,36 +119,67 @@ class SQLGenerator:
             'reason': f"Query similar to existing queries with similarity >= {self.similarity_threshold}"
         }
         
-        try:
-            with open(log_path, 'a') as f:
-                f.write(json.dumps(decision, default=str) + '\n')
-        except Exception as e:
-            logger.error(f"Error logging deduplication decision: {str(e)}")
+        self._pending_logs[log_path].append(decision)
+    
+    def _serialise_decisions(self, decisions: List[Dict[str, Any]]) -> bytes:
+        """Serialise decisions as NDJSON, rendering non-JSON values with str()."""
+        if orjson is not None:
+            # Datetimes are passed through to str() so output matches the stdlib path
+            return b''.join(
+                orjson.dumps(
+                    decision,
+                    default=str,
+                    option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_APPEND_NEWLINE
+                )
+                for decision in decisions
+            )
+        return ''.join(json.dumps(decision, default=str) + '\n' for decision in decisions).encode('utf-8')
+    
+    def flush_logs(self) -> None:
+        """Append all pending deduplication decisions to their log files."""
+        for log_path, decisions in self._pending_logs.items():
+            try:
+                with open(log_path, 'ab') as f:
+                    f.write(self._serialise_decisions(decisions))
+            except Exception as e:
+                logger.error(f"Error logging deduplication decisions to {log_path}: {str(e)}")
+        self._pending_logs.clear()
     
     def generate_sql_files(self, jobs: List[JobMetadata]):
         """Generate SQL files from unique queries."""
 
-        jobs_by_table = {}
+        jobs_by_table = defaultdict(list)
         for job in jobs:
             if job.destination_table:
                 key = (job.destination_table['datasetId'], job.destination_table['tableId'])
-                if key not in jobs_by_table:
-                    jobs_by_table[key] = []
                 jobs_by_table[key].append(job)
         
 
         for (dataset_id, table_id), table_jobs in jobs_by_table.items():
-            unique_queries = self.deduplicate_queries(table_jobs)    
+            # Decisions for a table all go to one log, so flush them once the table is done
+            try:
+                unique_queries = self.deduplicate_queries(table_jobs)
+            finally:
+                self.flush_logs()
                     
             # TODO Add tests to this, to ensure that I am not unintentionally overwriting actions or missing operations
             if unique_queries:
                 latest_query = max(unique_queries, key=lambda x: x['created_time'])
-                sql_path = self.output_config.definitions_dir / dataset_id / f"{table_id}.sql"
+                dataset_dir = os.path.join(self._defs_root_str, dataset_id)
+                sql_path = os.path.join(dataset_dir, f"{table_id}.sql")
 
                 try:
-                    sql_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(sql_path, 'w') as f:
-                        f.write(latest_query['query'])
+                    if dataset_dir not in self._created_dirs:
+                        os.makedirs(dataset_dir, exist_ok=True)
+                        self._created_dirs.add(dataset_dir)
+                    # One write on a raw fd avoids setting up a buffered text stream per file
+                    data = memoryview(latest_query['query'].encode('utf-8'))
+                    fd = os.open(sql_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                    try:
+                        while data:
+                            data = data[os.write(fd, data):]
+                    finally:
+                        os.close(fd)
                     logger.info(f"Generated SQL file: {sql_path}")
                 except Exception as e:
-                    logger.error(f"Error writing SQL file {sql_path}: {str(e)}")
\ No newline at end of file
+                    logger.error(f"Error writing SQL file {sql_path}: {str(e)}")
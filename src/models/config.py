@@ -14,6 +14,8 @@ class ProjectConfig:
     days_of_history: int = 30
     similarity_threshold: float = 0.9
     output_dir: Path = field(default_factory=lambda: Path('output'))
+    max_workers: int = 16
+    max_requests_per_second: float = 100.0
 
     def __post_init__(self):
         """Validate and convert output_dir to Path if necessary."""
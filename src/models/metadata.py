@@ -4,12 +4,15 @@ Defines the core data structures used throughout the application.
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone
 from enum import Enum, auto
 from pathlib import Path
+from time import time as _time
 from uuid import uuid4
 
+_UTC = timezone.utc
+
 def _get_utc_now() -> datetime:
     """
     Returns the current UTC timestamp.
@@ -43,8 +46,10 @@ class ProjectMigrationConfig:
     similarity_threshold: float = 0.9
     enable_incremental: bool = True
     batch_size: int = 1000
+    max_workers: int = 16
+    max_requests_per_second: float = 100.0
 
-@dataclass
+@dataclass(slots=True)
 class MigrationMetrics:
     """Metrics for tracking migration progress and results."""
     total_tables: int = 0
@@ -63,7 +68,7 @@ class MigrationMetrics:
             'component': component,
             'error': str(error),
             'context': context,
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': datetime.fromtimestamp(_time(), _UTC).isoformat()
         })
 
 @dataclass
@@ -122,7 +127,7 @@ class JobMetadata:
         statement_type: SQL statement type
         destination_table: Target table information
         query: SQL query text
-        referenced_tables: Tables referenced in the query
+        referenced_tables: Tables referenced in the query as (project, dataset, table) tuples
         labels: Job labels
     """
     job_id: str
@@ -131,7 +136,7 @@ class JobMetadata:
     statement_type: Optional[str] = None
     destination_table: Optional[Dict[str, str]] = None
     query: Optional[str] = None
-    referenced_tables: List[Dict[str, str]] = field(default_factory=list)
+    referenced_tables: List[Tuple[str, str, str]] = field(default_factory=list)
     labels: Optional[Dict[str, str]] = None
 
 @dataclass
@@ -4,8 +4,16 @@ Handles the core migration logic and state management.
 """
 
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Optional, Dict, Any
 from datetime import datetime, timezone
+from time import perf_counter
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .metadata import MetadataCollection, MigrationStatus
 from .config import ProjectConfig, OutputConfig
@@ -15,7 +23,9 @@ from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
-@dataclass
+_utcnow = partial(datetime.now, timezone.utc)
+
+@dataclass(slots=True)
 class MigrationMetrics:
     """Metrics collected during the migration process."""
     tables_processed: int = 0
@@ -25,7 +35,7 @@ class MigrationMetrics:
     errors_encountered: int = 0
     processing_time_seconds: float = 0.0
 
-@dataclass
+@dataclass(slots=True)
 class MigrationContext:
     """
     Context for migration execution, containing all necessary configuration and state.
@@ -42,16 +52,27 @@ class MigrationContext:
     project_config: ProjectConfig
     output_config: OutputConfig
     metadata: Optional[MetadataCollection] = None
-    start_time: datetime = field(default_factory=datetime.now(timezone.utc))
+    start_time: datetime = field(default_factory=_utcnow)
     end_time: Optional[datetime] = None
     status: MigrationStatus = field(default=MigrationStatus.NOT_STARTED)
     metrics: MigrationMetrics = field(default_factory=MigrationMetrics)
+    # Monotonic timings for the duration; start_time/end_time are for display
+    _start_perf: float = field(default_factory=perf_counter, init=False, repr=False)
+    _end_perf: Optional[float] = field(default=None, init=False, repr=False)
+
+    def mark_finished(self) -> None:
+        """Record the migration completion time."""
+        self._end_perf = perf_counter()
+        self.end_time = _utcnow()
 
     def calculate_duration(self) -> float:
         """Calculate the total duration of the migration in seconds."""
         if self.end_time is None:
             return 0.0
-        return (self.end_time - self.start_time).total_seconds()
+        if self._end_perf is None:
+            # end_time was assigned directly, so only the timestamps are available
+            return (self.end_time - self.start_time).total_seconds()
+        return self._end_perf - self._start_perf
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert context to dictionary for serialisation."""
@@ -70,6 +91,23 @@ class MigrationContext:
             }
         }
 
+    def to_bytes(self) -> bytes:
+        """
+        Serialise context to JSON bytes.
+        
+        Produces the same document as to_dict. With orjson the datetimes and
+        metrics dataclass are encoded natively rather than converted first.
+        """
+        if orjson is None:
+            return json.dumps(self.to_dict()).encode('utf-8')
+        return orjson.dumps({
+            'project_id': self.project_config.project_id,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'status': self.status.name,
+            'metrics': self.metrics
+        })
+
 class DataformMigration:
     """
     Orchestrates the migration process from BigQuery to Dataform.
@@ -115,11 +153,12 @@ class DataformMigration:
                 logger.error("No metadata available for configuration generation")
                 return False
 
-            actions_config = self._actions_generator.generate_actions_yaml(
-                self.context.metadata.tables,
-                self.context.metadata.jobs
+            self._actions_generator.write_actions_yaml(
+                self._actions_generator.iter_actions(
+                    self.context.metadata.tables,
+                    self.context.metadata.jobs
+                )
             )
-            self._actions_generator.write_actions_yaml(actions_config)
             return True
 
         except Exception as e:
@@ -167,7 +206,7 @@ class DataformMigration:
                 self.context.status = MigrationStatus.FAILED
                 return False
 
-            self.context.end_time = datetime.now(timezone.utc)
+            self.context.mark_finished()
             self._update_metrics()
             self.context.status = MigrationStatus.COMPLETED
 
@@ -3,13 +3,21 @@ Orchestration models for multi-project, multi-location Dataform migrations.
 Handles project coordination, state management, and data persistence.
 """
 
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime, time, timezone
+from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Any
-import json
-import yaml
+from typing import Dict, Iterator, List, Any, Tuple
+import re
+import threading
 
-from ..collectors.bigquery import BigQueryMetadataCollector
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ..collectors.bigquery import BigQueryMetadataCollector, RateLimiter
 from ..generators.actions import DataformActionsGenerator
 from ..generators.sql import SQLGenerator
 from .config import ProjectConfig, OutputConfig
@@ -18,6 +26,49 @@ from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# workflow_settings.yaml as yaml.dump would emit it, keys sorted, for values that need no quoting
+_WORKFLOW_SETTINGS_TEMPLATE = (
+    "dataformCoreVersion: {dataformCoreVersion}\n"
+    "defaultAssertionDataset: {defaultAssertionDataset}\n"
+    "defaultDataset: {defaultDataset}\n"
+    "defaultLocation: {defaultLocation}\n"
+    "defaultProject: {defaultProject}\n"
+)
+
+# Identifiers and x.y.z versions are emitted as plain scalars, unless they read as booleans or null
+_PLAIN_YAML_SCALAR = re.compile(r'[A-Za-z_][\w.-]*|\d+\.\d+\.\d+', re.ASCII)
+_YAML_KEYWORDS = frozenset({'yes', 'no', 'true', 'false', 'on', 'off', 'null'})
+
+def _is_plain_yaml_scalar(value: Any) -> bool:
+    """Check whether a value can be written to YAML unquoted."""
+    return (
+        isinstance(value, str)
+        and _PLAIN_YAML_SCALAR.fullmatch(value) is not None
+        and value.lower() not in _YAML_KEYWORDS
+    )
+
+def _dump_yaml(data: Dict[str, Any], stream: Any) -> None:
+    """Dump data with the libyaml safe dumper, importing PyYAML only when it is needed."""
+    import yaml
+    try:
+        from yaml import CSafeDumper as dumper
+    except ImportError:
+        from yaml import SafeDumper as dumper
+    yaml.dump(data, stream, Dumper=dumper)
+
+# NDJSON output is written in buffers of about this size to bound peak memory
+_NDJSON_BUFFER_BYTES = 64 * 1024 * 1024
+
+def _json_default(value: Any) -> Any:
+    """Render values the json module cannot serialise the same way orjson does."""
+    if is_dataclass(value) and not isinstance(value, type):
+        return {f.name: getattr(value, f.name) for f in fields(value)}
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
 class DataPersistence:
     """Handles persistence of collected metadata and migration state."""
     
@@ -35,12 +86,59 @@ class DataPersistence:
         path = self.raw_dir / f'jobs_{location}.ndjson'
         self._write_ndjson(path, jobs)
 
+    async def save_tables_async(self, location: str, tables: List[Dict[str, Any]]):
+        """Save collected table metadata as NDJSON without blocking the event loop."""
+        path = self.raw_dir / f'tables_{location}.ndjson'
+        await self._write_ndjson_async(path, tables)
+
+    async def save_jobs_async(self, location: str, jobs: List[Dict[str, Any]]):
+        """Save collected job metadata as NDJSON without blocking the event loop."""
+        path = self.raw_dir / f'jobs_{location}.ndjson'
+        await self._write_ndjson_async(path, jobs)
+
+    async def _write_ndjson_async(self, path: Path, items: List[Dict[str, Any]]):
+        """Write items to NDJSON file on a worker thread."""
+        # Imported here as asyncio is slow to import and only the async writers need it
+        import asyncio
+        await asyncio.to_thread(self._write_ndjson, path, items)
+
     def _write_ndjson(self, path: Path, items: List[Dict[str, Any]]):
-        """Write items to NDJSON file."""
-        with open(path, 'w') as f:
+        """
+        Write items to NDJSON file.
+        
+        Lines are joined into one buffer per write, so a typical file is written
+        with a single call. Very large outputs are flushed every
+        _NDJSON_BUFFER_BYTES.
+        """
+        with open(path, 'wb') as f:
+            buffer = []
+            buffered = 0
+            for line in self._serialise_items(items):
+                buffer.append(line)
+                buffered += len(line)
+                if buffered >= _NDJSON_BUFFER_BYTES:
+                    f.write(b''.join(buffer))
+                    buffer.clear()
+                    buffered = 0
+            
+            if buffer:
+                f.write(b''.join(buffer))
+
+    def _serialise_items(self, items: List[Dict[str, Any]]) -> Iterator[bytes]:
+        """
+        Serialise items to NDJSON lines.
+        
+        Dataclasses are written as JSON objects and datetimes as ISO 8601
+        strings, using orjson when it is installed.
+        """
+        if orjson is None:
+            import json
             for item in items:
-                json.dump(item, f, default=str)
-                f.write('\n')
+                yield (json.dumps(item, default=_json_default) + '\n').encode('utf-8')
+            return
+        
+        for item in items:
+            yield orjson.dumps(item, default=str, option=orjson.OPT_APPEND_NEWLINE)
 
 class ProjectMigrationManager:
     """Manages migration process for a single project."""
@@ -48,6 +146,10 @@ class ProjectMigrationManager:
     def __init__(self, config: ProjectMigrationConfig):
         self.config = config
         self.state = ProjectMigrationState(config)
+        # Locations migrate concurrently, so updates to shared state are serialised
+        self._state_lock = threading.Lock()
+        # BigQuery quotas are per project, so every location draws on one limiter
+        self._rate_limiter = RateLimiter(config.max_requests_per_second)
         
     def _setup_location(self, location_config: LocationConfig) -> OutputConfig:
         """Setup output configuration for a location."""
@@ -63,23 +165,30 @@ class ProjectMigrationManager:
         output_config.create_directories()
         
         with open(location_config.output_dir / 'workflow_settings.yaml', 'w') as f:
-            yaml.dump(workflow_config, f)
+            if all(_is_plain_yaml_scalar(value) for value in workflow_config.values()):
+                f.write(_WORKFLOW_SETTINGS_TEMPLATE.format_map(workflow_config))
+            else:
+                _dump_yaml(workflow_config, f)
             
         return output_config
         
     def migrate_location(self, location_config: LocationConfig) -> bool:
         """Migrate data for a specific location."""
+        logger.info(f"Migrating location: {location_config.location}")
         try:
             project_config = ProjectConfig(
                 project_id=self.config.project_id,
                 locations=[location_config.location],
                 days_of_history=self.config.days_of_history,
                 similarity_threshold=self.config.similarity_threshold,
-                output_dir=location_config.output_dir
+                output_dir=location_config.output_dir,
+                # Locations run concurrently, so they split the project's workers between them
+                max_workers=max(1, self.config.max_workers // len(self.config.locations)),
+                max_requests_per_second=self.config.max_requests_per_second
             )
             output_config = self._setup_location(location_config)
             
-            collector = BigQueryMetadataCollector(project_config, location_config)
+            collector = BigQueryMetadataCollector(project_config, location_config, self._rate_limiter)
             metadata = collector.collect()
             collector.close()
 
@@ -88,11 +197,12 @@ class ProjectMigrationManager:
             persistence.save_jobs(location_config.location, metadata.jobs)
             
             actions_generator = DataformActionsGenerator(project_config, output_config)
-            actions_config = actions_generator.generate_actions_yaml(
-                metadata.tables,
-                metadata.jobs
+            actions_generator.write_actions_yaml(
+                actions_generator.iter_actions(
+                    metadata.tables,
+                    metadata.jobs
+                )
             )
-            actions_generator.write_actions_yaml(actions_config)
 
             sql_generator = SQLGenerator(output_config, self.config.similarity_threshold)
             sql_generator.generate_sql_files(metadata.jobs)
@@ -100,23 +210,29 @@ class ProjectMigrationManager:
             return True
             
         except Exception as e:
-            self.state.metrics.add_error(
-                'migration_location',
-                e,
-                {'location': location_config.location}
-            )
+            with self._state_lock:
+                self.state.metrics.add_error(
+                    'migration_location',
+                    e,
+                    {'location': location_config.location}
+                )
             return False
 
     def migrate(self) -> bool:
-        """Execute migration for all locations in the project."""
+        """
+        Execute migration for all locations in the project.
+        
+        Locations are independent, so they are migrated concurrently. They
+        share the project's worker budget and request rate limit.
+        """
         self.state.state = MigrationStatus.IN_PROGRESS
         
         success = True
-        for location_config in self.config.locations:
-            logger.info(f"Migrating location: {location_config.location}")
-            if not self.migrate_location(location_config):
-                success = False
-                
+        if self.config.locations:
+            with ThreadPoolExecutor(max_workers=len(self.config.locations)) as executor:
+                results = list(executor.map(self.migrate_location, self.config.locations))
+            success = all(results)
+        
         self.state.state = MigrationStatus.COMPLETED if success else MigrationStatus.FAILED
         self.state.metrics.end_time = datetime.now(timezone.utc)
         return success
@@ -149,27 +265,47 @@ class DataformMigrationOrchestrator:
             **kwargs
         )
         
-    def migrate_projects(self, projects: List[str], **kwargs) -> Dict[str, bool]:
+    def _migrate_one(self, project_id: str, kwargs: Dict[str, Any]) -> bool:
+        """Migrate a single project, returning whether it succeeded."""
+        try:
+            config = self.create_project_config(project_id, **kwargs)
+            manager = ProjectMigrationManager(config)
+            return manager.migrate()
+            
+        except Exception as e:
+            logger.error(f"Failed to migrate project {project_id}: {str(e)}")
+            return False
+
+    def migrate_projects(
+        self,
+        projects: List[str],
+        max_concurrent_projects: int = 8,
+        **kwargs
+    ) -> Tuple[Dict[str, bool], bool]:
         """
         Migrate multiple projects to Dataform.
         
+        Projects are independent and mostly wait on BigQuery, so they are
+        migrated concurrently on a thread pool.
+        
         Args:
             projects: List of project IDs to migrate
-            **kwargs: Additional configuration options
+            max_concurrent_projects: Maximum number of projects migrated at once
+            **kwargs: Additional ProjectMigrationConfig options, such as the
+                per-project max_workers and max_requests_per_second
             
         Returns:
-            Dict mapping project IDs to migration success status
+            Tuple of a dict mapping project IDs to migration success status and
+            whether every project migrated successfully
         """
-        results = {}
-        
-        for project_id in projects:
-            try:
-                config = self.create_project_config(project_id, **kwargs)
-                manager = ProjectMigrationManager(config)
-                results[project_id] = manager.migrate()
-                
-            except Exception as e:
-                logger.error(f"Failed to migrate project {project_id}: {str(e)}")
-                results[project_id] = False
-                
-        return results
\ No newline at end of file
+        if not projects:
+            return {}, True
+        
+        with ThreadPoolExecutor(max_workers=min(max_concurrent_projects, len(projects))) as executor:
+            futures = {
+                project_id: executor.submit(self._migrate_one, project_id, kwargs)
+                for project_id in projects
+            }
+            results = {project_id: future.result() for project_id, future in futures.items()}
+        
+        return results, all(results.values())
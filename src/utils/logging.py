@@ -7,9 +7,9 @@ import logging
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Union
+from typing import Dict, Optional, Tuple, Union
 
-@dataclass
+@dataclass(slots=True)
 class LogConfig:
     """Configuration for logging setup."""
     log_level: int
@@ -26,6 +26,17 @@ class LogConfig:
             date_format='%Y-%m-%d %H:%M:%S'
         )
 
+# Formatters are stateless, so loggers with the same format share one instance
+_formatters: Dict[Tuple[str, str], logging.Formatter] = {}
+
+def _get_formatter(log_format: str, date_format: str) -> logging.Formatter:
+    """Return the shared formatter for a format and date format."""
+    key = (log_format, date_format)
+    formatter = _formatters.get(key)
+    if formatter is None:
+        formatter = _formatters[key] = logging.Formatter(fmt=log_format, datefmt=date_format)
+    return formatter
+
 def get_logger(
     name: str,
     level: Optional[int] = None,
@@ -42,34 +53,34 @@ def get_logger(
     Returns:
         Configured logger instance
     """
+    logger = logging.getLogger(name)
+    
+    # Loggers are only configured once, so existing ones are returned as they are
+    if logger.handlers:
+        return logger
+    
     config = LogConfig.get_default_config()
     if level is not None:
         config.log_level = level
     if log_file is not None:
         config.log_file = Path(log_file)
 
-    logger = logging.getLogger(name)
+    formatter = _get_formatter(config.log_format, config.date_format)
     
-    if not logger.handlers:
-        formatter = logging.Formatter(
-            fmt=config.log_format,
-            datefmt=config.date_format
-        )
-        
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-        
-        if config.log_file:
-            try:
-                config.log_file.parent.mkdir(parents=True, exist_ok=True)
-                file_handler = logging.FileHandler(config.log_file)
-                file_handler.setFormatter(formatter)
-                logger.addHandler(file_handler)
-            except Exception as e:
-                logger.error(f"Failed to create log file handler: {str(e)}")
-        
-        logger.setLevel(config.log_level)
-        logger.propagate = False
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+    
+    if config.log_file:
+        try:
+            config.log_file.parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.FileHandler(config.log_file)
+            file_handler.setFormatter(formatter)
+            logger.addHandler(file_handler)
+        except Exception as e:
+            logger.error(f"Failed to create log file handler: {str(e)}")
+    
+    logger.setLevel(config.log_level)
+    logger.propagate = False
     
-    return logger
\ No newline at end of file
+    return logger
@@ -3,11 +3,28 @@ Utility functions for SQL query similarity analysis.
 """
 
 from difflib import SequenceMatcher
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional, Set, Union
 import re
+from zlib import crc32
 from dataclasses import dataclass
 
-@dataclass
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = None
+    process = None
+
+# Query lists up to this size are searched exhaustively rather than through an LSH index
+LSH_MIN_QUERIES = 500
+
+# The default LSH bands can miss real matches below this similarity threshold
+LSH_MIN_THRESHOLD = 0.9
+
+# Single line and multi-line comments, removed in one pass over the query
+_COMMENT_PATTERN = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+
+@dataclass(slots=True)
 class QuerySimilarityConfig:
     """Configuration for query similarity analysis."""
     ignore_case: bool = True
@@ -32,31 +49,81 @@ def normalise_query(
     if config is None:
         config = QuerySimilarityConfig()
     
+    return _normalise_cached(
+        query,
+        config.ignore_case,
+        config.ignore_whitespace,
+        config.ignore_comments
+    )
+
+@lru_cache(maxsize=8192)
+def _normalise_cached(
+    query: str,
+    ignore_case: bool,
+    ignore_whitespace: bool,
+    ignore_comments: bool
+) -> str:
+    """Normalise a query, reusing the result for repeated text such as scheduled queries."""
     # TODO Bad REGEX is bad, but it's good enough for now :) - comments are here so I can find this later
-    # Remove comments
-    if config.ignore_comments:
-        query = re.sub(r'--.*$', '', query, flags=re.MULTILINE)  # Single line comments
-        query = re.sub(r'/\*.*?\*/', '', query, flags=re.DOTALL)  # Multi-line comments
+    # Remove comments - most queries carry none, and a substring check is far cheaper than the regex scan
+    if ignore_comments and ('--' in query or '/*' in query):
+        query = _COMMENT_PATTERN.sub('', query)
     
-    if config.ignore_whitespace:
+    if ignore_whitespace:
         query = ' '.join(query.split())
     
-    if config.ignore_case:
+    if ignore_case:
         query = query.lower()
     
     return query
 
+@dataclass(frozen=True)
+class NormalisedQuery:
+    """
+    A SQL query paired with its normalised form.
+    
+    Lets a query be normalised once and compared many times. It must be built
+    with the same configuration as the comparisons it is used in.
+    
+    Attributes:
+        original: Query text as given
+        normalised: Query text after normalise_query
+        length: Length of the normalised text
+    """
+    original: str
+    normalised: str
+    length: int
+    
+    @classmethod
+    def from_query(
+        cls,
+        query: str,
+        config: Optional[QuerySimilarityConfig] = None
+    ) -> 'NormalisedQuery':
+        """Normalise a query once for repeated comparisons."""
+        normalised = normalise_query(query, config)
+        return cls(original=query, normalised=normalised, length=len(normalised))
+
+def _as_normalised(
+    query: Union[str, NormalisedQuery],
+    config: QuerySimilarityConfig
+) -> NormalisedQuery:
+    """Normalise a query unless it has already been normalised."""
+    if isinstance(query, NormalisedQuery):
+        return query
+    return NormalisedQuery.from_query(query, config)
+
 def calculate_similarity(
-    query1: str,
-    query2: str,
+    query1: Union[str, NormalisedQuery],
+    query2: Union[str, NormalisedQuery],
     config: Optional[QuerySimilarityConfig] = None
 ) -> float:
     """
     Calculate similarity ratio between two SQL queries.
     
     Args:
-        query1: First SQL query
-        query2: Second SQL query
+        query1: First SQL query, raw or already normalised
+        query2: Second SQL query, raw or already normalised
         config: Optional configuration for similarity calculation
         
     Returns:
@@ -67,26 +134,68 @@ def calculate_similarity(
     
     # TODO this is a very basic implementation, I really should be using a proper SQL parser, but this is good enough for now
 
-    # Normalise queries
-    norm_query1 = normalise_query(query1, config)
-    norm_query2 = normalise_query(query2, config)
+    # Normalise queries, only once when both are the same (e.g. repeated scheduled queries)
+    norm_query1 = _as_normalised(query1, config)
+    if query2 is query1 or query2 == query1:
+        norm_query2 = norm_query1
+    else:
+        norm_query2 = _as_normalised(query2, config)
+    
+    return _similarity(norm_query1, norm_query2, config)
+
+def _similarity(
+    query1: NormalisedQuery,
+    query2: NormalisedQuery,
+    config: QuerySimilarityConfig,
+    threshold: float = 0.0
+) -> float:
+    """
+    Similarity ratio of two normalised queries.
     
+    When a threshold is given, pairs that cannot reach it may be scored 0.0
+    instead of their exact ratio.
+    """
     # Check minimum length requirement
-    if len(norm_query1) < config.min_length or len(norm_query2) < config.min_length:
+    if query1.length < config.min_length or query2.length < config.min_length:
         return 0.0
     
+    if query1.normalised == query2.normalised:
+        return 1.0
+    
     # Calculate similarity ratio
-    return SequenceMatcher(None, norm_query1, norm_query2).ratio()
+    return _ratio(query1.normalised, query2.normalised, threshold)
+
+def _ratio(query1: str, query2: str, threshold: float = 0.0) -> float:
+    """
+    Similarity ratio of two normalised queries.
+    
+    Uses RapidFuzz's exact Indel ratio when it is installed and difflib's
+    matching-block ratio otherwise. The two can disagree substantially, so
+    deduplication results depend on whether RapidFuzz is available.
+    """
+    if fuzz is not None:
+        return fuzz.ratio(query1, query2) / 100.0
+    
+    # Autojunk treats characters common in strings over 200 characters as junk, which
+    # scores near-identical long queries close to 0. Without it ratio() is far slower
+    matcher = SequenceMatcher(None, query1, query2, autojunk=False)
+    # Both bounds are cheap upper limits on ratio(), so most pairs never reach the full match
+    if threshold > 0.0 and (matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold):
+        return 0.0
+    return matcher.ratio()
 
 def find_similar_queries(
-    target_query: str,
-    query_list: list[str],
+    target_query: Union[str, NormalisedQuery],
+    query_list: List[Union[str, NormalisedQuery]],
     threshold: float = 0.9,
     config: Optional[QuerySimilarityConfig] = None
 ) -> list[tuple[int, float]]:
     """
     Find similar queries in a list of queries.
     
+    The target and each listed query are normalised once. Queries passed as
+    NormalisedQuery are used as they are.
+    
     Args:
         target_query: Query to compare against
         query_list: List of queries to search
@@ -96,11 +205,208 @@ def find_similar_queries(
     Returns:
         List of tuples containing (query_index, similarity_ratio)
     """
-    similar_queries = []
+    if config is None:
+        config = QuerySimilarityConfig()
     
-    for idx, query in enumerate(query_list):
-        similarity = calculate_similarity(target_query, query, config)
+    target = _as_normalised(target_query, config)
+    queries = [_as_normalised(query, config) for query in query_list]
+    
+    if process is None or threshold <= 0.0:
+        similar_queries = []
+        
+        for idx, query in enumerate(queries):
+            similarity = _similarity(target, query, config, threshold)
+            if similarity >= threshold:
+                similar_queries.append((idx, similarity))
+        
+        return sorted(similar_queries, key=lambda x: x[1], reverse=True)
+    
+    # Queries below the minimum length score 0.0, so only the rest need scoring
+    if target.length < config.min_length:
+        return []
+    
+    candidates = {
+        idx: query.normalised
+        for idx, query in enumerate(queries)
+        if query.length >= config.min_length
+    }
+    
+    # Score all candidates in one C call. The cutoff has slack for float rounding,
+    # and the exact threshold is applied below
+    similar_queries = []
+    for _, score, idx in process.extract(
+        target.normalised,
+        candidates,
+        scorer=fuzz.ratio,
+        processor=None,
+        limit=None,
+        score_cutoff=threshold * 100 - 1e-6
+    ):
+        similarity = score / 100.0
         if similarity >= threshold:
             similar_queries.append((idx, similarity))
     
-    return sorted(similar_queries, key=lambda x: x[1], reverse=True)
\ No newline at end of file
+    return sorted(similar_queries, key=lambda x: (-x[1], x[0]))
+
+def find_similar_queries_lsh(
+    target_query: Union[str, NormalisedQuery],
+    query_list: List[Union[str, NormalisedQuery]],
+    index: 'QueryLSHIndex',
+    threshold: float = 0.9,
+    config: Optional[QuerySimilarityConfig] = None
+) -> list[tuple[int, float]]:
+    """
+    Find similar queries in a list using a prebuilt LSH index.
+    
+    The index must hold the queries of query_list keyed by their position, so
+    it can be built once and searched for many targets. Only queries sharing a
+    band with the target are scored, so the result is approximate: a rare pair
+    above the threshold can be missed, more often below LSH_MIN_THRESHOLD.
+    Non-positive thresholds use the exhaustive find_similar_queries instead.
+    
+    Args:
+        target_query: Query to compare against
+        query_list: List of queries to search
+        index: LSH index of query_list, keyed by list position
+        threshold: Minimum similarity threshold
+        config: Optional configuration for similarity calculation
+        
+    Returns:
+        List of tuples containing (query_index, similarity_ratio)
+    """
+    if threshold <= 0.0:
+        return find_similar_queries(target_query, query_list, threshold, config)
+    
+    if config is None:
+        config = QuerySimilarityConfig()
+    
+    target = _as_normalised(target_query, config)
+    
+    # Only candidates are normalised, and those whose lengths alone rule out the
+    # threshold are dropped, since the ratio is at most 2 * min(len) / (len1 + len2)
+    positions = []
+    candidates = []
+    for idx in sorted(index.candidates(target)):
+        query = _as_normalised(query_list[idx], config)
+        if 2 * min(target.length, query.length) >= threshold * (target.length + query.length):
+            positions.append(idx)
+            candidates.append(query)
+    
+    return [
+        (positions[idx], similarity)
+        for idx, similarity in find_similar_queries(target, candidates, threshold, config)
+    ]
+
+class QueryLSHIndex:
+    """
+    Locality-sensitive hash index for finding candidate near-duplicate queries.
+    
+    Each normalised query is sketched with one-permutation MinHash over its
+    character shingles, and the sketch is split into bands. Queries sharing any
+    band become candidates, so only those need a full similarity comparison.
+    
+    Scattered edits hurt shingles more than they hurt similarity, since each
+    changed character breaks up to shingle_size shingles. Queries at
+    similarity t can therefore share as little as
+    (1 - k(1 - t)) / (1 + k(1 - t)) of their k-character shingles, about 0.54
+    for the default 3-character shingles at t = 0.9. The default 64 bands of
+    3 rows miss a pair at that Jaccard similarity with probability about
+    2e-5, so similarity thresholds of LSH_MIN_THRESHOLD and above lose
+    practically no matches; lower thresholds should compare exhaustively.
+    Shingles are hashed with crc32, so the same input always gives the same
+    candidates.
+    
+    Attributes:
+        num_bands: Number of bands the sketch is split into
+        rows_per_band: Number of sketch values per band
+        shingle_size: Length of the character shingles
+        config: Configuration used to normalise queries
+    """
+    
+    def __init__(
+        self,
+        num_bands: int = 64,
+        rows_per_band: int = 3,
+        shingle_size: int = 3,
+        config: Optional[QuerySimilarityConfig] = None
+    ):
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self.shingle_size = shingle_size
+        self.config = config
+        self._num_bins = num_bands * rows_per_band
+        self._buckets: List[Dict[int, List[Hashable]]] = [{} for _ in range(num_bands)]
+    
+    def _signature(self, query: Union[str, NormalisedQuery]) -> Optional[List[int]]:
+        """Compute the MinHash sketch of a query, or None if it is too short to sketch."""
+        if isinstance(query, NormalisedQuery):
+            normalised = query.normalised
+        else:
+            normalised = normalise_query(query, self.config)
+        # crc32 rather than hash(), which is salted per process and would make results vary between runs
+        data = normalised.encode('utf-8')
+        size = self.shingle_size
+        hashes = {crc32(data[i:i + size]) for i in range(len(data) - size + 1)}
+        if not hashes:
+            return None
+        
+        num_bins = self._num_bins
+        bins: List[Optional[int]] = [None] * num_bins
+        for value in hashes:
+            index = value % num_bins
+            current = bins[index]
+            if current is None or value < current:
+                bins[index] = value
+        
+        # Fill empty bins from the next non-empty bin so short queries still produce full bands
+        for index in range(num_bins):
+            offset = 1
+            while bins[index] is None:
+                bins[index] = bins[(index + offset) % num_bins]
+                offset += 1
+        
+        return bins
+    
+    def _bands(self, signature: List[int]) -> List[int]:
+        """
+        Split a signature into its bands, each reduced to a single hash.
+        
+        Buckets are keyed by one int rather than a tuple of row values, which
+        keeps the index small. A rare hash collision only adds a candidate that
+        the exact comparison then rejects.
+        """
+        rows = self.rows_per_band
+        return [hash(tuple(signature[i:i + rows])) for i in range(0, self._num_bins, rows)]
+    
+    def add(self, key: Hashable, query: Union[str, NormalisedQuery]) -> None:
+        """
+        Add a query to the index.
+        
+        Args:
+            key: Identifier returned by candidates() for this query
+            query: SQL query, raw or already normalised
+        """
+        signature = self._signature(query)
+        if signature is None:
+            return
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            buckets.setdefault(band, []).append(key)
+    
+    def candidates(self, query: Union[str, NormalisedQuery]) -> Set[Hashable]:
+        """
+        Find keys of indexed queries that may be similar to the given query.
+        
+        Args:
+            query: SQL query, raw or already normalised
+            
+        Returns:
+            Set of keys sharing at least one band with the query
+        """
+        signature = self._signature(query)
+        if signature is None:
+            return set()
+        
+        keys = set()
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            keys.update(buckets.get(band, ()))
+        return keys
@@ -0,0 +1,41 @@
+"""Tests for the Dataform actions generator."""
+
+import pytest
+
+from src.generators.actions import DataformActionsGenerator
+from src.models.config import OutputConfig, ProjectConfig
+from src.models.metadata import ColumnMetadata, SchemaMetadata, TableMetadata
+
+
+def _table(dataset_id: str, table_id: str) -> TableMetadata:
+    return TableMetadata(
+        'project', dataset_id, table_id, 'TABLE',
+        SchemaMetadata([ColumnMetadata('id', 'INT64')])
+    )
+
+
+def test_write_actions_yaml_replaces_existing_file(tmp_path):
+    output_config = OutputConfig(tmp_path)
+    generator = DataformActionsGenerator(ProjectConfig('project'), output_config)
+    actions_file = output_config.definitions_dir / 'actions.yaml'
+    actions_file.write_text('old\n')
+
+    generator.write_actions_yaml(generator.iter_actions([_table('dataset', 'table')], []))
+
+    assert actions_file.read_text().startswith('actions:\n- ')
+    assert sorted(p.name for p in output_config.definitions_dir.iterdir()) == ['actions.yaml', 'dataset']
+
+
+def test_write_actions_yaml_keeps_existing_file_on_generation_error(tmp_path):
+    output_config = OutputConfig(tmp_path)
+    generator = DataformActionsGenerator(ProjectConfig('project'), output_config)
+    actions_file = output_config.definitions_dir / 'actions.yaml'
+    actions_file.write_text('old\n')
+    # A file where the dataset directory belongs makes generating the action fail
+    (output_config.definitions_dir / 'dataset').write_text('')
+
+    with pytest.raises(FileExistsError):
+        generator.write_actions_yaml(generator.iter_actions([_table('dataset', 'table')], []))
+
+    assert actions_file.read_text() == 'old\n'
+    assert sorted(p.name for p in output_config.definitions_dir.iterdir()) == ['actions.yaml', 'dataset']
@@ -0,0 +1,133 @@
+"""Tests for the BigQuery metadata collector helpers."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from src.collectors import bigquery
+from src.collectors.bigquery import BigQueryMetadataCollector, RateLimiter, _parse_data_type
+
+
+def _row(table_name, field_path, data_type, is_nullable='YES', description=None,
+         policy_tags=None, last_modified_time=None):
+    return SimpleNamespace(
+        table_name=table_name,
+        field_path=field_path,
+        data_type=data_type,
+        is_nullable=is_nullable,
+        description=description,
+        policy_tags=policy_tags,
+        last_modified_time=last_modified_time
+    )
+
+
+def _parse_dataset_schemas(rows):
+    # The parser uses no collector state, so no BigQuery client is needed
+    collector = object.__new__(BigQueryMetadataCollector)
+    return collector._parse_dataset_schemas(rows)
+
+
+@pytest.mark.parametrize('data_type, expected', [
+    ('STRING', ('STRING', False)),
+    ('INT64', ('INTEGER', False)),
+    ('FLOAT64', ('FLOAT', False)),
+    ('BOOL', ('BOOLEAN', False)),
+    ('NUMERIC(10, 2)', ('NUMERIC', False)),
+    ('STRING(255)', ('STRING', False)),
+    ('STRUCT<a INT64, b STRING>', ('RECORD', False)),
+    ('ARRAY<INT64>', ('INTEGER', True)),
+    ('ARRAY<STRUCT<a ARRAY<STRING>>>', ('RECORD', True)),
+])
+def test_parse_data_type(data_type, expected):
+    assert _parse_data_type(data_type) == expected
+
+
+def test_parse_dataset_schemas_builds_nested_columns():
+    rows = [
+        _row('orders', 'id', 'INT64', is_nullable='NO', last_modified_time=1_700_000_000_000),
+        _row('orders', 'customer', 'STRUCT<name STRING, address STRUCT<city STRING>>',
+             description='Buyer', policy_tags=['tag']),
+        _row('orders', 'customer.name', 'STRING'),
+        _row('orders', 'customer.address', 'STRUCT<city STRING>'),
+        _row('orders', 'customer.address.city', 'STRING'),
+        _row('orders', 'items', 'ARRAY<STRUCT<sku STRING>>', is_nullable='NO'),
+        _row('orders', 'items.sku', 'STRING', is_nullable='NO'),
+        _row('events', 'id', 'STRING'),
+    ]
+
+    schemas = _parse_dataset_schemas(rows)
+
+    assert list(schemas) == ['orders', 'events']
+    schema, last_modified = schemas['orders']
+    assert last_modified == datetime.fromtimestamp(1_700_000_000, tz=timezone.utc)
+    assert schemas['events'][1] is None
+
+    identifier, customer, items = schema.columns
+    assert (identifier.name, identifier.field_type, identifier.mode) == ('id', 'INTEGER', 'REQUIRED')
+    assert (customer.field_type, customer.mode) == ('RECORD', 'NULLABLE')
+    assert customer.description == 'Buyer'
+    assert customer.policy_tags == ['tag']
+    assert [field.name for field in customer.fields] == ['name', 'address']
+    assert [field.name for field in customer.fields[1].fields] == ['city']
+    assert (items.field_type, items.mode) == ('RECORD', 'REPEATED')
+    # Only top-level columns take REQUIRED from INFORMATION_SCHEMA.COLUMNS
+    assert items.fields[0].mode == 'NULLABLE'
+
+
+def test_parse_dataset_schemas_without_rows():
+    assert _parse_dataset_schemas([]) == {}
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeClock()
+    monkeypatch.setattr(bigquery.time, 'monotonic', fake.monotonic)
+    monkeypatch.setattr(bigquery.time, 'sleep', fake.sleep)
+    return fake
+
+
+def test_rate_limiter_allows_a_burst_up_to_the_rate(clock):
+    limiter = RateLimiter(4)
+
+    for _ in range(4):
+        limiter.acquire()
+
+    assert clock.sleeps == []
+
+
+def test_rate_limiter_waits_for_the_next_token(clock):
+    limiter = RateLimiter(2)
+    for _ in range(2):
+        limiter.acquire()
+
+    limiter.acquire()
+
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_rate_limiter_refills_over_time_without_exceeding_capacity(clock):
+    limiter = RateLimiter(2)
+    for _ in range(2):
+        limiter.acquire()
+
+    clock.now += 10
+    for _ in range(2):
+        limiter.acquire()
+    assert clock.sleeps == []
+
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
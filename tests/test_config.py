@@ -0,0 +1,62 @@
+"""Tests for CLI configuration validation."""
+
+from pathlib import Path
+
+import pytest
+
+from src.cli.config import CLIConfig
+from src.cli.formatters import OutputFormat
+
+
+def _config(**overrides) -> CLIConfig:
+    values = dict(
+        projects=['project'],
+        locations=['US'],
+        days_of_history=30,
+        similarity_threshold=0.9,
+        output_dir=Path('output'),
+        enable_incremental=True,
+        output_mode=OutputFormat.DETAILED
+    )
+    values.update(overrides)
+    return CLIConfig(**values)
+
+
+def test_validate_accepts_valid_config():
+    _config().validate()
+
+
+@pytest.mark.parametrize('threshold', [0, 1])
+def test_validate_accepts_threshold_bounds(threshold):
+    _config(similarity_threshold=threshold).validate()
+
+
+@pytest.mark.parametrize('overrides, expected', [
+    ({'projects': []}, 'projects=[]'),
+    ({'projects': ['']}, "projects=['']"),
+    ({'locations': []}, 'locations=[]'),
+    ({'days_of_history': 0}, 'days_of_history=0'),
+    ({'similarity_threshold': 1.5}, 'similarity_threshold=1.5'),
+    ({'similarity_threshold': -0.1}, 'similarity_threshold=-0.1'),
+])
+def test_validate_reports_single_error(overrides, expected):
+    with pytest.raises(ValueError) as excinfo:
+        _config(**overrides).validate()
+
+    message = str(excinfo.value)
+    assert expected in message
+    assert len(message.splitlines()) == 1
+
+
+def test_validate_reports_every_error_at_once():
+    config = _config(projects=[], locations=[''], days_of_history=-5, similarity_threshold=2.0)
+
+    with pytest.raises(ValueError) as excinfo:
+        config.validate()
+
+    lines = str(excinfo.value).splitlines()
+    assert len(lines) == 4
+    assert 'projects=[]' in lines[0]
+    assert "locations=['']" in lines[1]
+    assert 'days_of_history=-5' in lines[2]
+    assert 'similarity_threshold=2.0' in lines[3]
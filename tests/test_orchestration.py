@@ -0,0 +1,52 @@
+"""Tests for the migration orchestration helpers."""
+
+import pytest
+import yaml
+
+from src.models.orchestration import _WORKFLOW_SETTINGS_TEMPLATE, _is_plain_yaml_scalar
+
+
+@pytest.mark.parametrize('value', [
+    'US',
+    'europe-west2',
+    'my_project',
+    'dataform_staging',
+    'project.with.dots',
+    '3.0.8',
+])
+def test_plain_yaml_scalars(value):
+    assert _is_plain_yaml_scalar(value)
+    assert yaml.safe_load(f'key: {value}\n') == {'key': value}
+
+
+@pytest.mark.parametrize('value', [
+    '',
+    'yes',
+    'No',
+    'TRUE',
+    'off',
+    'null',
+    '123',
+    '1.5',
+    '3.0',
+    '-project',
+    'has space',
+    'key: value',
+    'projet-é',
+    3,
+    None,
+])
+def test_values_needing_quotes_are_not_plain(value):
+    assert not _is_plain_yaml_scalar(value)
+
+
+def test_workflow_template_matches_yaml_dump():
+    workflow_config = {
+        'dataformCoreVersion': '3.0.8',
+        'defaultProject': 'my-project',
+        'defaultDataset': 'dataform_staging',
+        'defaultLocation': 'europe-west2',
+        'defaultAssertionDataset': 'dataform_assertions'
+    }
+
+    assert _WORKFLOW_SETTINGS_TEMPLATE.format_map(workflow_config) == yaml.dump(workflow_config)
@@ -0,0 +1,78 @@
+"""Tests for the query similarity utilities."""
+
+import random
+import string
+
+from src.utils.similarity import NormalisedQuery, QueryLSHIndex, find_similar_queries_lsh
+
+QUERY = "SELECT id, name, amount FROM project.dataset.orders WHERE status = 'open' AND region = 'EU'"
+NEAR_DUPLICATE = "SELECT id, name, amount FROM project.dataset.orders WHERE status = 'shut' AND region = 'EU'"
+UNRELATED = "INSERT INTO analytics.daily_totals SELECT day, SUM(revenue) FROM sales.events GROUP BY day"
+
+
+def test_candidates_include_identical_and_near_duplicate_queries():
+    index = QueryLSHIndex()
+    index.add('query', QUERY)
+    index.add('unrelated', UNRELATED)
+
+    assert 'query' in index.candidates(QUERY)
+    assert 'query' in index.candidates(NEAR_DUPLICATE)
+
+
+def test_candidates_skip_unrelated_queries():
+    rng = random.Random(0)
+    texts = [''.join(rng.choices(string.ascii_lowercase, k=80)) for _ in range(60)]
+    indexed, probes = texts[:50], texts[50:]
+    index = QueryLSHIndex()
+    for key, text in enumerate(indexed):
+        index.add(key, text)
+
+    # Occasional false candidates are expected, since the exact comparison rejects them
+    candidates = sum(len(index.candidates(text)) for text in probes)
+    assert candidates < 0.1 * len(indexed) * len(probes)
+
+
+def test_candidates_ignore_case_whitespace_and_comments():
+    index = QueryLSHIndex()
+    index.add('query', QUERY)
+
+    assert 'query' in index.candidates(f"-- nightly load\n{QUERY.lower()}\n")
+
+
+def test_raw_and_normalised_queries_give_the_same_candidates():
+    index = QueryLSHIndex()
+    index.add('raw', QUERY)
+    index.add('normalised', NormalisedQuery.from_query(QUERY))
+
+    assert index.candidates(QUERY) == index.candidates(NormalisedQuery.from_query(QUERY)) == {'raw', 'normalised'}
+
+
+def test_queries_too_short_to_sketch_are_not_indexed():
+    index = QueryLSHIndex()
+    index.add('short', 'ab')
+
+    assert index.candidates('ab') == set()
+    assert index.candidates(QUERY) == set()
+
+
+def test_candidates_are_deterministic_across_indexes():
+    queries = [QUERY, NEAR_DUPLICATE, UNRELATED]
+    first, second = QueryLSHIndex(), QueryLSHIndex()
+    for key, query in enumerate(queries):
+        first.add(key, query)
+        second.add(key, query)
+
+    assert [first.candidates(query) for query in queries] == [second.candidates(query) for query in queries]
+
+
+def test_find_similar_queries_lsh_uses_prebuilt_index():
+    queries = [UNRELATED, QUERY, NEAR_DUPLICATE]
+    index = QueryLSHIndex()
+    for position, query in enumerate(queries):
+        index.add(position, query)
+
+    matches = find_similar_queries_lsh(QUERY, queries, index, threshold=0.9)
+
+    assert [position for position, _ in matches] == [1, 2]
+    assert matches[0][1] == 1.0
+    assert 0.9 <= matches[1][1] < 1.0
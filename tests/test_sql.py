@@ -0,0 +1,54 @@
+"""Tests for the SQL generator."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.generators import sql
+from src.generators.sql import SQLGenerator
+from src.models.config import OutputConfig
+from src.models.metadata import JobMetadata
+from src.utils.similarity import LSH_MIN_THRESHOLD
+
+
+def _scheduled_jobs(count: int, seed: int):
+    """Jobs rerunning a few long templates with different literals, as scheduled queries do."""
+    rng = random.Random(seed)
+    templates = [
+        ' UNION ALL '.join(
+            f"SELECT {rng.randint(0, 99999)} AS id_{part}, '{rng.randint(10**7, 10**8)}' AS code, "
+            f"{rng.randint(0, 999)} + amount AS total FROM project.dataset.table_{rng.randint(0, 999)} "
+            f"WHERE created < {rng.randint(0, 9999)}"
+            for part in range(rng.randint(2, 4))
+        )
+        for _ in range(4)
+    ]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    jobs = []
+    for i in range(count):
+        query = ''.join(
+            str(rng.randint(0, 9)) if char.isdigit() and rng.random() < 0.1 else char
+            for char in rng.choice(templates)
+        )
+        jobs.append(JobMetadata(
+            job_id=f'job_{i}',
+            created_time=start + timedelta(minutes=i),
+            job_type='QUERY',
+            query=query
+        ))
+    return jobs
+
+
+@pytest.mark.parametrize('threshold', [LSH_MIN_THRESHOLD, 0.95])
+@pytest.mark.parametrize('seed', range(3))
+def test_lsh_deduplication_matches_exhaustive_search(tmp_path, monkeypatch, threshold, seed):
+    jobs = _scheduled_jobs(80, seed)
+    generator = SQLGenerator(OutputConfig(tmp_path), threshold)
+
+    monkeypatch.setattr(sql, 'LSH_MIN_QUERIES', 10**9)
+    exhaustive = [query['job_id'] for query in generator.deduplicate_queries(jobs)]
+    monkeypatch.setattr(sql, 'LSH_MIN_QUERIES', 0)
+    with_index = [query['job_id'] for query in generator.deduplicate_queries(jobs)]
+
+    assert with_index == exhaustive